@@ -10,13 +10,16 @@ import multiprocessing
 import subprocess
 import shutil
 import os.path
+import threading
 import time
 import datetime
-import re
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import TypeAlias
+from typing import Iterator, TypeAlias
 
 
 Argparse: TypeAlias = argparse.Namespace
@@ -41,63 +44,109 @@ class File:
         else:
             output = input_path
         self.output: Path = output.with_suffix(".chd")
+        self.input_posix: str = self.input.as_posix()
+        self.output_posix: str = self.output.as_posix()
+        self._suffix: str = self.input.suffix[1:].lower()
         self.type: str | None = App.match_type(self.input)
+        self.size_bytes: int | None = None
+        if self.type == "image" or self.type == "sheet":
+            try:
+                self.size_bytes = self.input.stat().st_size
+            except OSError:
+                # NOTE: Files listed from archives do not exist until they are
+                # extracted, so their size is looked up on first use instead.
+                pass
+        self.temp_path: Path | None = temp_path
+        # NOTE: Created on first use by ensure_tempdir, so no directory is
+        # created for archives that are skipped.
         self.tempdir: TemporaryDirectory | None = None
-        if self.type == "archive":
+
+    def ensure_tempdir(self) -> TemporaryDirectory:
+        """Get temporary directory to extract archive to, create if needed."""
+
+        if self.tempdir is None:
             # TODO: add option to use default temp path (see description of dir for how a default directory is chosen:
             #  https://docs.python.org/3/library/tempfile.html#tempfile.mkstemp)
-            if temp_path:
-                self.tempdir = TemporaryDirectory(dir=temp_path, prefix="tochd_")
+            if self.temp_path:
+                self.tempdir = TemporaryDirectory(dir=self.temp_path, prefix="tochd_")
             else:
                 # NOTE: the leading dot for each jobs temp dir is only added if user do not specify a path
                 self.tempdir = TemporaryDirectory(
                     dir=self.output.parent, prefix=".tochd_"
                 )
+        return self.tempdir
 
     def get_size(self, unit: str = "B"):
         exponents_map = {"B": 0, "KB": 1, "MB": 2, "GB": 3}
         if unit not in exponents_map:
             raise ValueError(f"Unit must be one of: {list(exponents_map.keys())}")
 
-        file_size = self.input.stat().st_size
-        if unit == "bytes":
+        if self.size_bytes is None:
+            self.size_bytes = self.input.stat().st_size
+        file_size: int = self.size_bytes
+        if unit == "B":
             return file_size
 
         size = file_size / 1024 ** exponents_map[unit]
         return round(size, 3)
 
 
-def filter_other_in_gdi_dirs(list_of_files: list[File]):
-    """Remove all other files from list within same dir as .gdi."""
+def filter_file_list(list_of_files: list[File]) -> list[File]:
+    """Remove other files in dirs with .gdi and images in dirs with sheets."""
 
-    gdi_dirs = [f.input.parent for f in list_of_files if f.input.suffix == ".gdi"]
-    if gdi_dirs:
-        filtered_list: list[File] = []
-        for file in list_of_files:
-            if file.input.parent not in gdi_dirs or file.input.suffix == ".gdi":
-                # BUG: If the .gdi file contains lines that are not actual
-                # existing files, then this can lead to removing of all
-                # other files from queue and stop processing.
-                filtered_list.append(file)
-        return filtered_list
-    else:
+    gdi_dirs: set[Path] = set()
+    sheet_dirs: set[Path] = set()
+    for file in list_of_files:
+        if file._suffix == "gdi":
+            gdi_dirs.add(file.input.parent)
+        if file.type == "sheet":
+            sheet_dirs.add(file.input.parent)
+    if not gdi_dirs and not sheet_dirs:
         return list_of_files
 
-
-def filter_images_in_sheet_dirs(list_of_files: list[File]):
-    """Remove all image files from list within same dir as sheets."""
-
-    sheet_dirs = [f.input.parent for f in list_of_files if f.type == "sheet"]
-    if sheet_dirs:
-        filtered_list: list[File] = []
-        for file in list_of_files:
-            if file.input.parent in sheet_dirs and file.input.suffix == ".iso":
-                continue
-            else:
-                filtered_list.append(file)
-        return filtered_list
+    return [
+        file
+        for file in list_of_files
+        if keep_in_dirs(file.input.parent, file._suffix, gdi_dirs, sheet_dirs)
+    ]
+
+
+def filter_path_list(
+    list_of_paths: list[tuple[Path, str | None]]
+) -> list[tuple[Path, str | None]]:
+    """Remove other paths in dirs with .gdi and images in dirs with sheets."""
+
+    gdi_dirs: set[Path] = set()
+    sheet_dirs: set[Path] = set()
+    for path, file_type in list_of_paths:
+        if path.suffix.lower() == ".gdi":
+            gdi_dirs.add(path.parent)
+        if file_type == "sheet":
+            sheet_dirs.add(path.parent)
+    if not gdi_dirs and not sheet_dirs:
+        return list_of_paths
+
+    return [
+        (path, file_type)
+        for path, file_type in list_of_paths
+        if keep_in_dirs(path.parent, path.suffix[1:].lower(), gdi_dirs, sheet_dirs)
+    ]
+
+
+def keep_in_dirs(
+    parent: Path, suffix: str, gdi_dirs: set[Path], sheet_dirs: set[Path]
+) -> bool:
+    """Check if file with parent dir and suffix is kept by the dir filters."""
+
+    if parent in gdi_dirs and suffix != "gdi":
+        # BUG: If the .gdi file contains lines that are not actual
+        # existing files, then this can lead to removing of all
+        # other files from queue and stop processing.
+        return False
+    elif parent in sheet_dirs and suffix == "iso":
+        return False
     else:
-        return list_of_files
+        return True
 
 
 class App:
@@ -122,6 +171,9 @@ class App:
             "tar",
         ),
     }
+    _ext_to_type: dict[str, str] = {
+        ext: file_type for file_type, exts in types.items() for ext in exts
+    }
     exclude_hidden = True
     home_as_posix: str = Path("~").expanduser().as_posix()
 
@@ -160,6 +212,8 @@ class App:
             "chdman": App.which(args.chdman),
             "7z": App.which(args.p7z),
         }
+        self._chdman_posix: str = self.programs["chdman"].as_posix()
+        self._7z_posix: str = self.programs["7z"].as_posix()
         self.output_dir: Path | None = App.existing_dir(args.output_dir)
         self.temp_path: Path | None = App.existing_dir(args.temp_dir)
         self.no_rename: bool = args.no_rename
@@ -167,9 +221,35 @@ class App:
         if args.stdin:
             self.files.extend(self.get_files(get_stdin_lines()))
         self.chd_processors: int = args.chd_processors
+        chdman_options: list[str] = []
+        if self.chd_processors:
+            chdman_options.extend(["--numprocessors", str(self.chd_processors)])
+        if self.hunksize:
+            chdman_options.extend(["--hunksize", str(self.hunksize)])
+        self._chdman_cd_args: list[str] = [
+            self._chdman_posix,
+            "createcd",
+            *chdman_options,
+        ]
+        self._chdman_dvd_args: list[str] = [
+            self._chdman_posix,
+            "createdvd",
+            *chdman_options,
+        ]
         self.parallel: bool = args.parallel
         self.threads: int = args.threads
         self.quiet: bool = args.quiet
+        self._stdout: int | None
+        self._stderr: int | None
+        if self.quiet:
+            self._stdout = subprocess.PIPE
+            self._stderr = subprocess.PIPE
+        elif self.parallel:
+            self._stdout = None
+            self._stderr = subprocess.PIPE
+        else:
+            self._stdout = None
+            self._stderr = None
         self.names: bool = args.names
         self.dry_run: bool = args.dry_run
         self.emergency_break: bool = args.emergency_break
@@ -178,6 +258,12 @@ class App:
         self.stats_skipped: int = 0
         self.stats_failed: int = 0
         self.stats_completed: int = 0
+        # NOTE: Only set in worker processes, to send job messages to the main
+        # process, which does all the printing and counting.
+        self.log_queue: multiprocessing.Queue | None = None
+        # NOTE: Share of "-t" threads for each worker process, used to convert
+        # multiple files from one archive at once.
+        self.archive_threads: int = 1
 
         if self.appimage:
             os.environ["OWD"] = cwd
@@ -186,58 +272,58 @@ class App:
     def get_files(self, files: list[str]) -> list:
         """Filter and convert list of strings to list of supported Files."""
 
+        paths: Iterator[Path] | list[Path]
+        if len(files) > 1:
+            # NOTE: Resolving paths mostly waits on the filesystem, which can
+            # be slow on network mounts, so many are resolved at once.
+            with ThreadPoolExecutor(max_workers=32) as executor:
+                paths = list(executor.map(fullpath, files))
+        else:
+            paths = map(fullpath, files)
+
         new_list: list[File] = []
-        for file in files:
-            path: Path = fullpath(file)
+        for path in paths:
             supported: File | None
             if path.is_file():
+                if self.exclude_hidden and path.name.startswith("."):
+                    continue
                 supported = self.get_supported_file(path)
                 if supported:
                     new_list.append(supported)
             elif path.is_dir():
-                for dir_entry in path.iterdir():
-                    supported = self.get_supported_file(dir_entry)
-                    if supported:
-                        new_list.append(supported)
-        new_list = filter_other_in_gdi_dirs(new_list)
-        new_list = filter_images_in_sheet_dirs(new_list)
-        return new_list
+                with os.scandir(path) as entries:
+                    for dir_entry in entries:
+                        if self.exclude_hidden and dir_entry.name.startswith("."):
+                            continue
+                        elif not dir_entry.is_file():
+                            continue
+                        supported = self.get_supported_file(Path(dir_entry.path))
+                        if supported:
+                            new_list.append(supported)
+        return filter_file_list(new_list)
 
     def get_supported_file(self, path: Path):
-        """Transform Path to a File, if supported type and not hidden dir."""
+        """Transform Path to a File, if supported type."""
 
-        if not (self.exclude_hidden and path.name.startswith(".")):
-            file: File = File(path, dir_path=self.output_dir, temp_path=self.temp_path)
-            if file.type:
-                return file
+        # NOTE: Type is taken from the resolved path, which differs from the
+        # entry name for symlinks.
+        file: File = File(path, dir_path=self.output_dir, temp_path=self.temp_path)
+        if file.type:
+            return file
         return None
 
     def run_convert_process(self, command: list[str]) -> CompletedProcess:
-        """Executes command as a process and determines stdout and stderr."""
+        """Executes command as a process with stdout and stderr of App."""
 
-        stdout: int | None
-        stderr: int | None
-        if self.quiet:
-            stdout = subprocess.PIPE
-            stderr = subprocess.PIPE
-        elif self.parallel:
-            stdout = None
-            stderr = subprocess.PIPE
-        else:
-            stdout = None
-            stderr = None
-        return subprocess.run(command, stdout=stdout, stderr=stderr, text=True)
+        return subprocess.run(
+            command, stdout=self._stdout, stderr=self._stderr, text=True
+        )
 
     def convert(self, file_list: list, start_index: int = 1) -> int:
         """Convert list of files to CHD."""
 
         last_index: int = start_index
-        pool = None
-        if self.parallel:
-            if self.threads == 0:
-                pool = multiprocessing.Pool()
-            else:
-                pool = multiprocessing.Pool(processes=self.threads)
+        jobs: list[tuple[File, int]] = []
         for job_index, file in enumerate(file_list, start_index):
             last_index = job_index + 1
             if self.dry_run:
@@ -248,32 +334,50 @@ class App:
                 continue
             elif file.type == "image" or file.type == "sheet":
                 if self.parallel:
-                    pool.apply_async(
-                        self.convert_file,
-                        (
-                            file,
-                            job_index,
-                        ),
-                    )
+                    jobs.append((file, job_index))
                 else:
                     self.convert_file(file, job_index)
             elif file.type == "archive":
                 if self.parallel:
-                    pool.apply_async(
-                        self.convert_archive,
-                        (
-                            file,
-                            job_index,
-                        ),
-                    )
+                    jobs.append((file, job_index))
                 else:
                     self.convert_archive(file, job_index)
             else:
                 self.message_job("Skipped", file.input, job_index)
                 continue
-        if self.parallel:
-            pool.close()
-            pool.join()
+        if self.parallel and jobs:
+            threads: int = self.threads or available_cpu_count() or 1
+            workers: int = min(threads, len(jobs))
+            # NOTE: Threads not needed for workers, because there are fewer
+            # jobs than threads, are split between the workers. This keeps
+            # the total number of chdman processes within "-t".
+            self.archive_threads = max(1, threads // workers)
+            log_queue: multiprocessing.Queue = multiprocessing.Queue()
+            logger = threading.Thread(
+                target=self.log_worker_messages, args=(log_queue,), daemon=True
+            )
+            logger.start()
+            try:
+                # NOTE: App and list of jobs are sent only once to each worker,
+                # each task refers to its job by position in the list.
+                executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(self, jobs, log_queue),
+                )
+                try:
+                    # NOTE: Consume the results, so exceptions raised in
+                    # workers are not silently discarded.
+                    # NOTE: Each job is a long running conversion, so jobs are
+                    # handed out one at a time to the next free worker.
+                    list(executor.map(_run_job, range(len(jobs)), chunksize=1))
+                finally:
+                    # NOTE: Jobs not started yet are dropped, if main process
+                    # is stopped with Ctrl+c and option "-E".
+                    executor.shutdown(cancel_futures=True)
+            finally:
+                log_queue.put(None)
+                logger.join()
         return last_index
 
     def convert_file(self, file: File, job_index: int) -> CompletedProcess:
@@ -281,27 +385,19 @@ class App:
 
         if job_index:
             self.message_job("Started", file.input, job_index)
-        command: list[str] = [self.programs["chdman"].as_posix()]
-        match self.mode:
-            case "auto":
-                if file.get_size("MB") > 750:
-                    command.append("createdvd")
-                else:
-                    command.append("createcd")
-            case "cd":
-                command.append("createcd")
-            case "dvd":
-                command.append("createdvd")
-        if self.chd_processors:
-            command.append("--numprocessors")
-            command.append(str(self.chd_processors))
-        if self.hunksize:
-            command.append("--hunksize")
-            command.append(str(self.hunksize))
-        command.append("--input")
-        command.append(file.input.as_posix())
-        command.append("--output")
-        command.append(file.output.as_posix())
+        base: list[str]
+        if self.mode == "dvd":
+            base = self._chdman_dvd_args
+        elif self.mode == "auto" and file.get_size() > 750 * 1024 * 1024:
+            base = self._chdman_dvd_args
+        else:
+            base = self._chdman_cd_args
+        command: list[str] = base + [
+            "--input",
+            file.input_posix,
+            "--output",
+            file.output_posix,
+        ]
 
         completed = self.run_convert_process(command)
         if job_index:
@@ -315,93 +411,167 @@ class App:
     def convert_archive(self, archive: File, job_index: int) -> CompletedProcess | None:
         """Extract and convert an archive to CHD."""
 
-        self.message_job("Started", archive.input, job_index)
-        archlist: list[File] = self.listing_from_archive(archive)
-        archlist = [f for f in archlist if f.type == "image" or f.type == "sheet"]
-        archlist = filter_other_in_gdi_dirs(archlist)
-        archlist = filter_images_in_sheet_dirs(archlist)
-        # workaround
-        if [f for f in archlist if f.type == "sheet"]:
-            archlist = [f for f in archlist if not f.input.suffix == ".iso"]
-
-        if not archlist:
-            self.message_job("Failed", archive.output, job_index)
-            return None
+        # NOTE: Temporary files are removed even if job is interrupted.
+        try:
+            # NOTE: Entries are checked by their paths inside the archive, so
+            # no temporary directory is needed for skipped archives.
+            entries: list[tuple[Path, str | None]] = []
+            for entry in self.listing_from_archive(archive):
+                file_type: str | None = App.match_type(entry)
+                if file_type == "image" or file_type == "sheet":
+                    entries.append((entry, file_type))
+            entries = filter_path_list(entries)
+            # workaround
+            if any(file_type == "sheet" for _, file_type in entries):
+                entries = [e for e in entries if not e[0].suffix.lower() == ".iso"]
+
+            if not entries:
+                self.message_job("Started", archive.input, job_index)
+                self.message_job("Failed", archive.output, job_index)
+                return None
+
+            # NOTE: A skipped job is not reported as started, same as in
+            # App.convert.
+            dest_paths: list[Path] = [self.dest_path(archive, e) for e, _ in entries]
+            if all(dest_path.exists() for dest_path in dest_paths):
+                self.message_job("Skipped", archive.input, job_index)
+                return None
+
+            self.message_job("Started", archive.input, job_index)
+
+            tempdir: str = archive.ensure_tempdir().name
+            archlist: list[File] = [File(tempdir / entry) for entry, _ in entries]
+
+            command: list[str] = [self._7z_posix, "x"]
+            if self.quiet or self.parallel:
+                command.append("-y")
+            if self.parallel:
+                command.append("-bd")
+            members: list[str] = []
+            if len(entries) == 1 and entries[0][1] == "image":
+                # NOTE: chdman needs random access to the image and its size, so it
+                # cannot be streamed through a pipe from 7z. But other files are
+                # not needed, therefore only the image itself is extracted. Sheets
+                # still need the whole archive for all their referenced tracks.
+                command.append("-spd")
+                members.append(entries[0][0].as_posix())
+            command.append(f"-o{tempdir}")
+            command.append(archive.input_posix)
+            command.extend(members)
+
+            completed = self.run_convert_process(command)
+            if completed.returncode == 0:
+                with ExitStack() as stack:
+                    results: Iterator[CompletedProcess]
+                    if self.archive_threads > 1 and len(archlist) > 1:
+                        # NOTE: chdman runs as an external process, so threads are
+                        # enough to convert multiple files from one archive at once.
+                        executor = stack.enter_context(
+                            ThreadPoolExecutor(max_workers=self.archive_threads)
+                        )
+                        results = executor.map(self.convert_file, archlist, repeat(0))
+                    else:
+                        results = map(self.convert_file, archlist, repeat(0))
+                    for file, dest_path, completed in zip(
+                        archlist, dest_paths, results
+                    ):
+                        dest_path.unlink(missing_ok=True)
+                        if completed.returncode == 0:
+                            shutil.move(file.output_posix, dest_path.as_posix())
+                            if dest_path.exists():
+                                self.message_job("Completed", dest_path, job_index)
+                        else:
+                            self.message_job("Failed", dest_path, job_index)
+            else:
+                self.message_job("Failed", archive.output, job_index)
 
-        command: list[str] = [self.programs["7z"].as_posix(), "x"]
-        if self.quiet or self.parallel:
-            command.append("-y")
-        if self.parallel:
-            command.append("-bd")
-        command.append(f"-o{archive.tempdir.name}")
-        command.append(archive.input.as_posix())
+            return completed
+        finally:
+            if archive.tempdir:
+                archive.tempdir.cleanup()
 
-        completed = self.run_convert_process(command)
-        if completed.returncode == 0:
-            for file in archlist:
-                completed = self.convert_file(file, 0)
-                if self.no_rename:
-                    dest_path = archive.output.with_name(file.output.name)
-                else:
-                    dest_path = archive.output
-                dest_path.unlink(missing_ok=True)
-                if completed.returncode == 0:
-                    shutil.move(file.output.as_posix(), dest_path.as_posix())
-                    if dest_path.exists():
-                        self.message_job("Completed", dest_path, job_index)
-                else:
-                    self.message_job("Failed", dest_path, job_index)
-        else:
-            self.message_job("Failed", archive.output, job_index)
+    def dest_path(self, archive: File, entry: Path) -> Path:
+        """Get final path of CHD converted from a path inside archive."""
 
-        archive.tempdir.cleanup()
-        return completed
+        if self.no_rename:
+            return archive.output.with_name(entry.with_suffix(".chd").name)
+        else:
+            return archive.output
 
-    def listing_from_archive(self, file) -> list[File]:
-        """Get a list of all paths in archive as File."""
+    def listing_from_archive(self, file) -> list[Path]:
+        """Get a list of all paths in archive, relative to archive."""
 
         command: list[str] = [
-            self.programs["7z"].as_posix(),
+            self._7z_posix,
             "l",
             "-slt",
             "-y",
-            file.input.as_posix(),
+            file.input_posix,
         ]
 
-        completed = subprocess.run(command, capture_output=True, text=True)
-        if completed.returncode == 0:
-            listing: list[str] = re.findall(r"Path = (.+)", completed.stdout, re.M)
-            return [File(file.tempdir.name / Path(entry)) for entry in listing[1:]]
+        listing: list[Path] = []
+        with subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        ) as process:
+            # NOTE: First path in listing is the archive itself.
+            skip_first: bool = True
+            for line in process.stdout:
+                if not line.startswith("Path = "):
+                    continue
+                elif skip_first:
+                    skip_first = False
+                    continue
+                entry: str = line[7:].rstrip("\n")
+                listing.append(Path(entry))
+        if process.wait() == 0:
+            return listing
         else:
             return []
 
     def message_job(self, message: str, path: Path, job_index: int) -> None:
-        """Print job message with correct formatting."""
-
-        if not self.parallel:
-            # BUG: Counting is thread unsafe currently. Disable until a
-            # solution is found.
-            match message:
-                case "Started":
-                    self.stats_started += 1
-                case "Skipped":
-                    self.stats_skipped += 1
-                case "Failed":
-                    self.stats_failed += 1
-                case "Completed":
-                    self.stats_completed += 1
+        """Print job message or send it to main process from a worker."""
 
-        pad_size: int = 12
-        pad_size = pad_size - len(str(job_index))
-        padded_msg = message.rjust(pad_size)
         if self.names:
             path_msg = path.name
         else:
             path_msg = path.as_posix()
+        if self.log_queue:
+            self.log_queue.put((message, job_index, path_msg))
+        else:
+            self.log_job(message, job_index, path_msg)
+        return None
+
+    def log_job(self, message: str, job_index: int, path_msg: str) -> None:
+        """Count and print job message with correct formatting."""
+
+        match message:
+            case "Started":
+                self.stats_started += 1
+            case "Skipped":
+                self.stats_skipped += 1
+            case "Failed":
+                self.stats_failed += 1
+            case "Completed":
+                self.stats_completed += 1
+
+        pad_size: int = 12
+        pad_size = pad_size - len(str(job_index))
+        padded_msg = message.rjust(pad_size)
         message = f"Job {job_index} {padded_msg}:\t{path_msg}"
         print(message, flush=True)
         return None
 
+    def log_worker_messages(self, log_queue: multiprocessing.Queue) -> None:
+        """Log job messages sent from worker processes, until None is sent."""
+
+        for item in iter(log_queue.get, None):
+            self.log_job(*item)
+        return None
+
     @classmethod
     def which(cls, command: str) -> Path:
         """Find command in scripts dir, $PATH or get any custom fullpath."""
@@ -447,12 +617,71 @@ class App:
     def match_type(cls, path: Path) -> str | None:
         """Check and get supported file type of paths extension."""
 
-        if path.suffix:
-            suffix: str = path.suffix.lower().lstrip(".")
-            for file_type, extensions in App.types.items():
-                if suffix in extensions:
-                    return file_type
+        suffix: str = path.suffix
+        return cls._ext_to_type.get(suffix[1:].lower()) if suffix else None
+
+
+# NOTE: Set by _init_worker in each worker process of App.convert.
+_APP: App | None = None
+_JOBS: list[tuple[File, int]] = []
+# NOTE: Set in worker process on Ctrl+c with option "-E", to skip any job
+# that was already queued for this worker.
+_INTERRUPTED: bool = False
+
+
+def _init_worker(
+    app: App, jobs: list[tuple[File, int]], log_queue: multiprocessing.Queue
+) -> None:
+    """Store App and list of jobs in a worker process."""
+
+    global _APP, _JOBS
+    app.log_queue = log_queue
+    _APP = app
+    _JOBS = jobs
+
+    # NOTE: Workers do not inherit the signal handlers of main process. Same
+    # policy as in main is used: Ctrl+c cancels current job only, unless "-E"
+    # is active. SIGINT is handled instead of ignored, because an ignored
+    # signal would be inherited by chdman and 7z, and the job would continue.
+    if app.emergency_break:
+        signal.signal(signal.SIGINT, _worker_sigint_exit)
+    else:
+        signal.signal(signal.SIGINT, _worker_sigint_continue)
+
+
+def _worker_sigint_exit(*_) -> None:
+    """Stop worker process on Ctrl+c keyboard interruption."""
+
+    global _INTERRUPTED
+    _INTERRUPTED = True
+    sys.exit(255)
+
+
+def _worker_sigint_continue(*_) -> None:
+    """Keep worker process running on Ctrl+c, only the current job fails."""
+
+    return None
+
+
+def _run_job(position: int) -> None:
+    """Run job at position in list of jobs stored in a worker process."""
+
+    if _INTERRUPTED:
         return None
+    # NOTE: Result is not returned, as it would be sent back to the main
+    # process only to be discarded, including captured stderr of chdman.
+    file, job_index = _JOBS[position]
+    _dispatch(_APP, file, job_index)
+    return None
+
+
+def _dispatch(app: App, file: File, job_index: int) -> CompletedProcess | None:
+    """Run a single job in a worker process, based on type of File."""
+
+    if file.type == "archive":
+        return app.convert_archive(file, job_index)
+    else:
+        return app.convert_file(file, job_index)
 
 
 def fullpath(file: str) -> Path:
@@ -468,22 +697,16 @@ def available_cpu_count() -> int:
         count = len(os.sched_getaffinity(0))
     else:
         count = os.cpu_count()
-    if count == 0 or count is None:
-        return 0
-    else:
-        return count
+    return count or 0
 
 
 def get_stdin_lines() -> list[str]:
     """Read each line from stdin and split by newline char."""
 
-    stdin: list[str] = []
-    for line in sys.stdin.readlines():
-        if line:
-            stdin.extend(line.split("\n"))
-    stdin_set: set[str] = set(stdin)
-    stdin_set.discard("")
-    return list(stdin_set)
+    stdin: set[str] = {
+        s for line in sys.stdin for s in line.rstrip("\n").split("\n") if s
+    }
+    return list(stdin)
 
 
 def elapsed_time(seconds: int | float) -> str:
@@ -585,8 +808,8 @@ def parse_arguments(args: list[str] | None = None) -> Argparse:
         action="store_true",
         help=(
             "disable automatic renaming for CHD files that were build from "
-            'archives, no test for "if file already exists" can be provided '
-            "beforehand, only applicable to archive sources, without this "
+            'archives, test for "if file already exists" is done after listing '
+            "content of archive, only applicable to archive sources, without this "
             "option files from archives are renamed to match the archive"
         ),
     )
@@ -600,7 +823,9 @@ def parse_arguments(args: list[str] | None = None) -> Argparse:
             "activate multithreading to process multiple files at the same "
             "time, hides progress bar and stderr stream from invoked "
             "commands, but stdout is still output, automates user input "
-            'when possible, set number of threads with option "-t"'
+            'when possible, set number of threads with option "-t", worker '
+            "processes are started with the forkserver start method, where "
+            "available, which adds a fixed warmup time"
         ),
     )
 
@@ -764,6 +989,20 @@ def main(args: list[str] | None = None) -> int:
     else:
         app = App(parse_arguments(args))
 
+    # NOTE: Not available on Windows, which keeps using its default "spawn".
+    # Compiled builds are skipped too, because their executable is tochd
+    # itself, which cannot start the forkserver.
+    frozen: bool = app.frozen or app.nuitka
+    if not frozen and "forkserver" in multiprocessing.get_all_start_methods():
+        multiprocessing.set_start_method("forkserver", force=True)
+        # NOTE: Modules are imported once in the forkserver and then inherited
+        # by each forked worker, instead of importing them for each worker.
+        # The main script itself is preloaded by default, which would be
+        # disabled by setting a custom list without it.
+        multiprocessing.set_forkserver_preload(
+            ["__main__", "subprocess", "shutil", "pathlib", "os", "argparse"]
+        )
+
     atexit.register(signal_sigint)
     signal.signal(signal.SIGTERM, signal_sigterm)
     signal.signal(signal.SIGINT, signal_sigint)
@@ -802,12 +1041,10 @@ def main(args: list[str] | None = None) -> int:
     app.convert(app.files, start_index=1)
 
     if app.stats:
-        if not app.parallel:
-            # BUG: Counting variables is currently thread unsafe.
-            print("Started:", app.stats_started)
-            print("Skipped:", app.stats_skipped)
-            print("Failed:", app.stats_failed)
-            print("Completed:", app.stats_completed)
+        print("Started:", app.stats_started)
+        print("Skipped:", app.stats_skipped)
+        print("Failed:", app.stats_failed)
+        print("Completed:", app.stats_completed)
         end_time = time.time()
         print("Elapsed time:", elapsed_time(end_time - start_time))
     return 0